@@ -10,18 +10,357 @@ Organization: RSK World
 Example script demonstrating video classification using the dataset.
 """
 
+import atexit
+import hashlib
+import json
 import os
+import queue
 import sys
+import threading
 import cv2
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # Add parent directory to path to import utils
 sys.path.append(str(Path(__file__).parent.parent))
 
-from utils.video_utils import get_video_info, extract_frame, preprocess_frame
+from utils.video_utils import get_video_info, preprocess_frame
 from utils.dataset_utils import get_videos_by_category, create_label_mapping
 
+# Optional GPU-accelerated decoding via decord (NVDEC). Falls back to the
+# OpenCV CPU decode path when decord or a GPU context is unavailable.
+try:
+    import decord
+    _HAS_DECORD = True
+except ImportError:
+    decord = None
+    _HAS_DECORD = False
+
+# Optional CUDA batch decode via torchvision.io (NVDEC). Used by
+# predict_batch to decode a whole mini-batch of middle frames on the
+# GPU and stack them into one tensor for a single forward pass.
+try:
+    import torch
+    import torchvision.io as tvio
+    _HAS_TORCH_CUDA = torch.cuda.is_available()
+except ImportError:
+    torch = None
+    tvio = None
+    _HAS_TORCH_CUDA = False
+
+_reader_cache = {}
+
+# Persistent video-info cache so repeat evaluation runs skip the
+# container open/parse entirely. Entries are keyed by path and
+# invalidated when the file's mtime or size changes.
+_INFO_CACHE_PATH = '.video_info_cache.json'
+
+try:
+    with open(_INFO_CACHE_PATH, 'r') as _f:
+        _info_cache = json.load(_f)
+except (OSError, ValueError):
+    _info_cache = {}
+
+_info_cache_dirty = False
+
+
+def _save_info_cache():
+    """Write the video-info cache back to disk if it changed."""
+    if not _info_cache_dirty:
+        return
+    try:
+        with open(_INFO_CACHE_PATH, 'w') as f:
+            json.dump(_info_cache, f)
+    except OSError:
+        pass
+
+
+atexit.register(_save_info_cache)
+
+
+@lru_cache(maxsize=8192)
+def _cached_info(video_path: str, mtime_ns: int, size: int):
+    """In-process memoized get_video_info; mtime/size are part of the key."""
+    return get_video_info(video_path)
+
+
+def get_video_info_cached(video_path: str):
+    """
+    Get video information, memoized by (path, mtime, size).
+
+    Cache hits skip the cv2.VideoCapture open entirely; results also
+    persist across runs via a JSON sidecar file.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        Dictionary with video information or None if error
+    """
+    global _info_cache_dirty
+
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return None
+
+    cached = _info_cache.get(video_path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    info = _cached_info(video_path, stat.st_mtime_ns, stat.st_size)
+    if info is not None:
+        _info_cache[video_path] = [stat.st_mtime_ns, stat.st_size, info]
+        _info_cache_dirty = True
+
+    return info
+
+
+def _get_reader(video_path: str):
+    """
+    Get a cached decord VideoReader for a video, preferring GPU decode.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        decord.VideoReader instance or None if decord is unavailable
+        or the video cannot be opened
+    """
+    if not _HAS_DECORD:
+        return None
+
+    reader = _reader_cache.get(video_path)
+    if reader is not None:
+        return reader
+
+    try:
+        ctx = decord.gpu(0)
+    except Exception:
+        ctx = decord.cpu(0)
+
+    try:
+        reader = decord.VideoReader(video_path, ctx=ctx)
+    except Exception:
+        return None
+
+    _reader_cache[video_path] = reader
+    return reader
+
+
+def _open_and_middle_frame(video_path: str):
+    """
+    Read video info and the middle frame with a single VideoCapture open.
+
+    Fuses the previous get_video_info + extract_frame sequence so each
+    video pays the container-parse cost only once. Video info read from
+    the open capture is stored in the persistent info cache as a side
+    effect.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        Frame as numpy array (BGR) or None if error
+    """
+    global _info_cache_dirty
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    info = {
+        'fps': fps,
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'frame_count': frame_count,
+        'duration': frame_count / fps if fps > 0 else 0.0,
+        'fourcc': int(cap.get(cv2.CAP_PROP_FOURCC))
+    }
+
+    try:
+        stat = os.stat(video_path)
+        _info_cache[video_path] = [stat.st_mtime_ns, stat.st_size, info]
+        _info_cache_dirty = True
+    except OSError:
+        pass
+
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count // 2)
+    ret, frame = cap.read()
+    cap.release()
+
+    return frame if ret else None
+
+
+# On-disk middle-frame cache: repeat evaluation runs load a saved numpy
+# array instead of re-opening and re-decoding every test video
+_THUMB_CACHE_DIR = Path('.cache/thumbs')
+
+
+def _thumb_cache_path(video_path: str):
+    """Return the thumbnail cache path for a video, or None on stat error."""
+    try:
+        mtime = os.path.getmtime(video_path)
+    except OSError:
+        return None
+
+    key = hashlib.blake2b(f'{video_path}:{mtime}'.encode(),
+                          digest_size=16).hexdigest()
+    return _THUMB_CACHE_DIR / f'{key}.npy'
+
+
+def _extract_middle_frame(video_path: str):
+    """
+    Extract the middle frame of a video, using decord when available.
+
+    Decoded frames are cached to disk keyed by path and mtime, so
+    repeat runs (e.g. evaluate_classifier) skip the decoder entirely.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        Frame as numpy array (BGR) or None if error
+    """
+    cache_path = _thumb_cache_path(video_path)
+    if cache_path is not None and cache_path.exists():
+        try:
+            return np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError):
+            pass
+
+    reader = _get_reader(video_path)
+    if reader is not None and len(reader) > 0:
+        frame = reader[len(reader) // 2].asnumpy()
+        # decord returns RGB; keep BGR to match the OpenCV path
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    else:
+        # Fall back to the OpenCV CPU decode path (single capture open)
+        frame = _open_and_middle_frame(video_path)
+
+    if frame is not None and cache_path is not None:
+        try:
+            _THUMB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            np.save(cache_path, frame)
+        except OSError:
+            pass
+
+    return frame
+
+
+def _worker_init():
+    """Initialize a prediction worker process (runs once per worker)."""
+    # A real model would be loaded here, once per worker, instead of
+    # once per video
+
+
+def _batch_middle_frames_cuda(video_paths: list):
+    """
+    Decode the middle frames of a batch of videos on the GPU.
+
+    Each video gets its own torchvision VideoReader on the CUDA device,
+    so NVDEC decodes several streams concurrently; the results are
+    stacked into a single (N, 3, H, W) tensor ready for one model
+    forward pass.
+
+    Args:
+        video_paths: List of video file paths
+
+    Returns:
+        Tuple of (stacked CUDA tensor or None, list of per-video success
+        flags). The tensor only contains the successfully decoded frames.
+    """
+    frames = []
+    decoded = []
+
+    for video_path in video_paths:
+        frame = None
+        try:
+            reader = tvio.VideoReader(video_path, 'video', device='cuda')
+            duration = reader.get_metadata()['video']['duration'][0]
+            reader.seek(duration / 2)
+            frame = next(reader)['data']
+        except Exception:
+            frame = None
+
+        decoded.append(frame is not None)
+        if frame is not None:
+            frames.append(frame)
+
+    if not frames:
+        return None, decoded
+
+    height = min(f.shape[1] for f in frames)
+    width = min(f.shape[2] for f in frames)
+    frames = [f[:, :height, :width] for f in frames]
+
+    return torch.stack(frames), decoded
+
+
+def _prepare_one(video_path: str) -> bool:
+    """
+    Decode and preprocess one video's middle frame in a worker.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        True if the frame was decoded and preprocessed successfully
+    """
+    frame = _extract_middle_frame(video_path)
+    if frame is None:
+        return False
+
+    preprocess_frame(frame)
+    return True
+
+
+def _predict_one(video_path: str, reverse_mapping) -> str:
+    """
+    Predict category for a single video.
+
+    Module-level so it can be pickled and run in worker processes.
+
+    Args:
+        video_path: Path to video file
+        reverse_mapping: Sequence mapping label integers to category names
+
+    Returns:
+        Predicted category name
+    """
+    # Extract a sample frame (middle frame)
+    frame = _extract_middle_frame(video_path)
+    return _classify_frame(frame, reverse_mapping)
+
+
+def _classify_frame(frame, reverse_mapping) -> str:
+    """
+    Classify an already-decoded frame.
+
+    Args:
+        frame: Frame as numpy array (BGR) or None
+        reverse_mapping: Sequence mapping label integers to category names
+
+    Returns:
+        Predicted category name
+    """
+    if frame is None:
+        return "unknown"
+
+    # Preprocess frame
+    processed_frame = preprocess_frame(frame)
+
+    # TODO: Replace with actual model prediction
+    # For now, return a random category as example
+    import random
+    predicted_label = random.randint(0, len(reverse_mapping) - 1)
+
+    return reverse_mapping[predicted_label]
+
 
 class VideoClassifier:
     """
@@ -38,7 +377,26 @@ class VideoClassifier:
         """
         self.categories = categories
         self.label_mapping = create_label_mapping(categories)
-        self.reverse_mapping = {v: k for k, v in self.label_mapping.items()}
+        # Labels are dense integers 0..N-1, so a tuple indexed by label
+        # replaces the reverse dict and skips hashing on every lookup
+        self.reverse_mapping = tuple(sorted(categories))
+        self._rng = np.random.default_rng()
+        self._pool = None
+
+    def _get_pool(self, max_workers):
+        """Get the persistent worker pool, starting it on first use."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_worker_init
+            )
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
     
     def predict(self, video_path: str) -> str:
         """
@@ -50,54 +408,91 @@ class VideoClassifier:
         Returns:
             Predicted category name
         """
-        # Extract a sample frame (middle frame)
-        info = get_video_info(video_path)
-        if info is None:
-            return "unknown"
-        
-        middle_frame = info['frame_count'] // 2
-        frame = extract_frame(video_path, middle_frame)
-        
-        if frame is None:
-            return "unknown"
-        
-        # Preprocess frame
-        processed_frame = preprocess_frame(frame)
-        
-        # TODO: Replace with actual model prediction
-        # For now, return a random category as example
-        import random
-        predicted_label = random.randint(0, len(self.categories) - 1)
-        
-        return self.reverse_mapping[predicted_label]
-    
-    def predict_batch(self, video_paths: list) -> list:
+        return _predict_one(video_path, self.reverse_mapping)
+
+    def predict_batch(self, video_paths: list, max_workers: int = None) -> list:
         """
         Predict categories for multiple videos.
-        
+
+        Videos are decoded concurrently across worker processes so the
+        per-video OpenCV decode latency overlaps instead of adding up.
+        The pool is started once and reused across calls, so repeated
+        batches do not pay process spawn or mapping-pickling costs.
+
         Args:
             video_paths: List of video file paths
-            
+            max_workers: Number of worker processes (default: os.cpu_count())
+
         Returns:
-            List of predicted category names
+            List of predicted category names (same order as video_paths)
+        """
+        if len(video_paths) <= 1:
+            return [self.predict(video_path) for video_path in video_paths]
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+
+        # Draw all stub labels in one vectorized call instead of one
+        # Python-level random.randint per video
+        labels = self._rng.integers(0, len(self.categories),
+                                    size=len(video_paths))
+
+        if _HAS_TORCH_CUDA:
+            # Decode the whole mini-batch on the GPU and keep the frames
+            # stacked for a single forward pass
+            batch, decoded = _batch_middle_frames_cuda(video_paths)
+        else:
+            executor = self._get_pool(max_workers)
+            decoded = executor.map(_prepare_one, video_paths, chunksize=8)
+
+        # TODO: Replace with actual model prediction over the batch
+        return [
+            self.reverse_mapping[label] if ok else "unknown"
+            for ok, label in zip(decoded, labels)
+        ]
+
+    def predict_stream(self, video_paths: list):
+        """
+        Yield predictions one by one with decode/classify overlap.
+
+        A background thread decodes the next video while the current
+        frame is being classified (double buffering with a bounded
+        queue), so decode latency is hidden without holding more than
+        two frames in memory.
+
+        Args:
+            video_paths: List of video file paths
+
+        Yields:
+            Predicted category name for each video, in order
         """
-        predictions = []
-        for video_path in video_paths:
-            prediction = self.predict(video_path)
-            predictions.append(prediction)
-        return predictions
+        sentinel = object()
+        frame_queue = queue.Queue(maxsize=2)
+
+        def producer():
+            for video_path in video_paths:
+                frame_queue.put(_extract_middle_frame(video_path))
+            frame_queue.put(sentinel)
 
+        threading.Thread(target=producer, daemon=True).start()
 
-def evaluate_classifier(classifier, test_dir: str):
+        while True:
+            item = frame_queue.get()
+            if item is sentinel:
+                break
+            yield _classify_frame(item, self.reverse_mapping)
+
+
+def evaluate_classifier(classifier, videos_by_category: dict):
     """
     Evaluate classifier on test set.
-    
+
     Args:
         classifier: VideoClassifier instance
-        test_dir: Directory containing test videos organized by category
+        videos_by_category: Dictionary mapping categories to video lists
+            (from get_videos_by_category), shared with the caller so the
+            test directory is only walked once
     """
-    videos_by_category = get_videos_by_category(test_dir)
-    
     total = 0
     correct = 0
     
@@ -106,8 +501,7 @@ def evaluate_classifier(classifier, test_dir: str):
     
     for category, videos in videos_by_category.items():
         category_correct = 0
-        for video in videos:
-            prediction = classifier.predict(video)
+        for prediction in classifier.predict_stream(videos):
             total += 1
             if prediction == category:
                 correct += 1
@@ -143,12 +537,15 @@ def main():
     
     # Initialize classifier
     classifier = VideoClassifier(categories)
-    
+
+    # Walk the test directory once and share the result between
+    # evaluation and the single-video demo below
+    videos_by_category = get_videos_by_category(test_dir)
+
     # Evaluate on test set
-    evaluate_classifier(classifier, test_dir)
-    
+    evaluate_classifier(classifier, videos_by_category)
+
     # Example: Predict single video
-    videos_by_category = get_videos_by_category(test_dir)
     if videos_by_category:
         first_category = list(videos_by_category.keys())[0]
         if videos_by_category[first_category]:
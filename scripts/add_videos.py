@@ -11,53 +11,102 @@ Organization: RSK World
 This script helps add videos to the dataset and organize them by category.
 """
 
+import errno
 import os
 import shutil
+import subprocess
 import argparse
-import yaml
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 
+# Add parent directory to path to import utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import _yaml
+
 
 def load_config(config_path='config.yaml'):
     """Load configuration from YAML file."""
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = _yaml.safe_load(f)
         if config is None:
             raise ValueError(f"Configuration file is empty or invalid: {config_path}")
         return config
 
 
+# Built once at import so the hot scan loop only does a C-level
+# frozenset membership test per file
+_DEFAULT_EXTS = frozenset({'.mp4', '.mov', '.avi', '.mkv'})
+
+
 def get_video_files(directory, formats=None):
     """
     Get all video files from a directory.
-    
+
     Args:
         directory: Directory to search
         formats: List of video formats
     """
+    # Single os.walk pass with a case-insensitive extension check instead
+    # of one recursive rglob sweep per format and case
     if formats is None:
-        formats = ['mp4', 'mov', 'avi', 'mkv']
-    
+        extensions = _DEFAULT_EXTS
+    else:
+        extensions = frozenset(f".{format.lower()}" for format in formats)
+
     video_files = []
-    for format in formats:
-        video_files.extend(Path(directory).rglob(f"*.{format}"))
-        video_files.extend(Path(directory).rglob(f"*.{format.upper()}"))
-    
-    return [str(f) for f in video_files]
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in extensions:
+                video_files.append(os.path.join(root, name))
 
+    return video_files
 
-def copy_videos_to_category(source_dir, target_dir, category, config):
+
+def _copy_one(src, dst, mode='copy'):
+    """
+    Copy a single file, optionally using a zero-copy fast path.
+
+    With 'link' the destination is hardlinked in O(1); with 'reflink' a
+    copy-on-write clone is attempted (XFS/Btrfs). Both fall back to a
+    regular byte copy when the filesystem does not support them (e.g.
+    source and target on different volumes).
+
+    Args:
+        src: Source file path
+        dst: Destination file path
+        mode: Copy mode ('copy', 'link', 'reflink')
+    """
+    if mode == 'link':
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+    elif mode == 'reflink':
+        result = subprocess.run(['cp', '--reflink=always', src, dst],
+                                capture_output=True)
+        if result.returncode == 0:
+            return
+
+    shutil.copy2(src, dst)
+
+
+def copy_videos_to_category(source_dir, target_dir, category, config, mode='copy'):
     """
     Copy videos from source to target category directory.
-    
+
     Args:
         source_dir: Source directory containing videos
         target_dir: Target dataset directory (train/test/validation)
         category: Category name
         config: Configuration dictionary
+        mode: Copy mode ('copy', 'link', 'reflink')
     """
     # Get video files
     video_files = get_video_files(source_dir, config['video']['formats'])
@@ -70,22 +119,37 @@ def copy_videos_to_category(source_dir, target_dir, category, config):
     category_dir = os.path.join(target_dir, category)
     os.makedirs(category_dir, exist_ok=True)
     
-    # Copy videos
-    copied = 0
-    for video_file in tqdm(video_files, desc=f"Copying {category} videos"):
+    # One directory listing instead of a stat syscall per source file
+    existing = {entry.name for entry in os.scandir(category_dir)}
+
+    # Build (source, destination) pairs, skipping files that already exist
+    pairs = []
+    for video_file in video_files:
         filename = os.path.basename(video_file)
-        dest_path = os.path.join(category_dir, filename)
-        
-        # Skip if file already exists
-        if os.path.exists(dest_path):
+        if filename in existing:
             continue
-        
-        try:
-            shutil.copy2(video_file, dest_path)
-            copied += 1
-        except Exception as e:
-            print(f"Error copying {video_file}: {e}")
-    
+        pairs.append((video_file, os.path.join(category_dir, filename)))
+
+    if not pairs:
+        return 0
+
+    # Copy concurrently: copies are I/O-bound, so overlapping them keeps
+    # the disk queue full instead of waiting on one stream at a time
+    copied = 0
+    max_workers = min(16, len(pairs))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_copy_one, src, dst, mode): src
+            for src, dst in pairs
+        }
+        for future in tqdm(as_completed(futures), total=len(futures),
+                           desc=f"Copying {category} videos"):
+            try:
+                future.result()
+                copied += 1
+            except Exception as e:
+                print(f"Error copying {futures[future]}: {e}")
+
     return copied
 
 
@@ -159,18 +223,19 @@ def interactive_add_videos(config):
     print(f"\nSuccessfully copied {copied} videos to {target_dir}")
 
 
-def batch_add_videos(source_dir, target_dir, category, config):
+def batch_add_videos(source_dir, target_dir, category, config, mode='copy'):
     """
     Batch mode to add videos.
-    
+
     Args:
         source_dir: Source directory containing videos
         target_dir: Target dataset directory
         category: Category name
         config: Configuration dictionary
+        mode: Copy mode ('copy', 'link', 'reflink')
     """
     print(f"Adding {category} videos from {source_dir} to {target_dir}...")
-    copied = copy_videos_to_category(source_dir, target_dir, category, config)
+    copied = copy_videos_to_category(source_dir, target_dir, category, config, mode=mode)
     print(f"Successfully copied {copied} videos")
 
 
@@ -186,6 +251,9 @@ def main():
                        help='Path to configuration file')
     parser.add_argument('--interactive', action='store_true',
                        help='Run in interactive mode')
+    parser.add_argument('--mode', type=str, default='copy',
+                       choices=['copy', 'link', 'reflink'],
+                       help='How to transfer files: byte copy, hardlink, or CoW reflink')
     
     args = parser.parse_args()
     
@@ -211,7 +279,7 @@ def main():
         print(f"Error: Invalid category. Available categories: {config['categories']}")
         return
     
-    batch_add_videos(args.source, args.target, args.category, config)
+    batch_add_videos(args.source, args.target, args.category, config, mode=args.mode)
 
 
 if __name__ == '__main__':
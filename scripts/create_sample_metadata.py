@@ -11,11 +11,16 @@ Organization: RSK World
 This script creates metadata files for the dataset.
 """
 
-import json
 import os
-import yaml
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from utils.dataset_utils import get_dataset_statistics, get_categories, get_videos_by_category
+
+# Add parent directory to path to import utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import _json, _yaml
+from utils.dataset_utils import get_categories, _scan_split_entries
 
 
 def load_config(config_path='config.yaml'):
@@ -23,7 +28,7 @@ def load_config(config_path='config.yaml'):
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = _yaml.safe_load(f)
         if config is None:
             raise ValueError(f"Configuration file is empty or invalid: {config_path}")
         return config
@@ -54,29 +59,38 @@ def create_metadata_file(output_path='metadata.json', dataset_dir='data'):
         'splits': {}
     }
     
-    # Process each split
-    for split in ['train', 'test', 'validation']:
-        split_dir = os.path.join(dataset_dir, split)
-        if os.path.exists(split_dir):
-            stats = get_dataset_statistics(split_dir)
-            videos_by_category = get_videos_by_category(split_dir)
-            
-            metadata['splits'][split] = {
-                'total_categories': stats['total_categories'],
-                'total_videos': stats['total_videos'],
-                'categories': {}
+    # Scan the three splits concurrently: they are independent
+    # I/O-bound directory walks, so fanning out hides per-split latency
+    splits = [split for split in ['train', 'test', 'validation']
+              if os.path.exists(os.path.join(dataset_dir, split))]
+
+    if splits:
+        split_dirs = [os.path.join(dataset_dir, split) for split in splits]
+        with ThreadPoolExecutor(max_workers=len(splits)) as executor:
+            scans = dict(zip(splits, executor.map(_scan_split_entries, split_dirs)))
+    else:
+        scans = {}
+
+    for split, entries_by_category in scans.items():
+        # Each scan yields the statistics, file names and sizes in one
+        # walk; names/sizes come from each DirEntry's cached stat, so
+        # no per-file stat syscalls are repeated
+        metadata['splits'][split] = {
+            'total_categories': len(entries_by_category),
+            'total_videos': sum(len(v) for v in entries_by_category.values()),
+            'categories': {}
+        }
+
+        for category, videos in entries_by_category.items():
+            metadata['splits'][split]['categories'][category] = {
+                'count': len(videos),
+                'files': [name for _, name, _, _ in videos],
+                'total_size_bytes': sum(size for _, _, size, _ in videos)
             }
-            
-            for category, videos in videos_by_category.items():
-                metadata['splits'][split]['categories'][category] = {
-                    'count': len(videos),
-                    'files': [os.path.basename(v) for v in videos]
-                }
     
     # Save metadata
-    with open(output_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
-    
+    _json.dump_indented(metadata, output_path)
+
     print(f"Metadata saved to: {output_path}")
     return metadata
 
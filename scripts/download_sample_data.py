@@ -12,16 +12,21 @@ This script provides instructions and helper functions for downloading sample vi
 """
 
 import os
-import yaml
+import sys
 from pathlib import Path
 
+# Add parent directory to path to import utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import _yaml
+
 
 def load_config(config_path='config.yaml'):
     """Load configuration from YAML file."""
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = _yaml.safe_load(f)
         if config is None:
             raise ValueError(f"Configuration file is empty or invalid: {config_path}")
         return config
@@ -85,13 +90,10 @@ def create_sample_structure():
     raw_videos_dir = Path('raw_videos')
     raw_videos_dir.mkdir(exist_ok=True)
     
-    print("\nCreating sample directory structure...")
-    for category in categories:
-        category_dir = raw_videos_dir / category
-        category_dir.mkdir(exist_ok=True)
-        
-        # Create README in each category
-        readme_content = f"""# {category.capitalize()} Category
+    # Encode the README template once; the per-category work is then a
+    # mkdir plus one open/write/close of ready-made bytes, skipping the
+    # text-mode encoding that Path.write_text repeats for every file
+    template = """# {title} Category
 
 <!--
 Project: Video Classification Dataset
@@ -114,9 +116,23 @@ After adding videos, run:
 python scripts/organize_dataset.py --input raw_videos --output data
 ```
 """
-        
-        readme_path = category_dir / 'README.md'
-        readme_path.write_text(readme_content)
+    head, rest = template.split('{title}', 1)
+    mid, tail = rest.split('{category}', 1)
+    head, mid, tail = head.encode(), mid.encode(), tail.encode()
+
+    print("\nCreating sample directory structure...")
+    for category in categories:
+        category_dir = raw_videos_dir / category
+        category_dir.mkdir(exist_ok=True)
+
+        readme_bytes = (head + category.capitalize().encode()
+                        + mid + category.encode() + tail)
+        fd = os.open(str(category_dir / 'README.md'),
+                     os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, readme_bytes)
+        finally:
+            os.close(fd)
         print(f"  Created: {category_dir}/")
     
     print(f"\nSample structure created in: {raw_videos_dir}")
@@ -12,40 +12,266 @@ This script extracts frames from video files for video classification tasks.
 """
 
 import cv2
+import numpy as np
+import math
 import os
 import argparse
-import yaml
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 
+# Add parent directory to path to import utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import _frame_math, _yaml
+from utils.video_utils import _open_capture
+
+# Resolved once at import; None when FFmpeg is not installed
+FFMPEG_BIN = shutil.which('ffmpeg')
+FFPROBE_BIN = shutil.which('ffprobe')
+
+# Below this duration (seconds) chunked extraction costs more in process
+# startup than it saves
+_PARALLEL_MIN_DURATION = 60.0
+
+# Workers parallelize across videos already; keep OpenCV from spawning
+# its own per-process thread pool on top and let FFmpeg's decoder
+# threads do the work
+cv2.setNumThreads(0)
+
+
+# Optional SIMD JPEG encoding via libjpeg-turbo; falls back to
+# cv2.imwrite when PyTurboJPEG or the native library is missing
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
+
 
 def load_config(config_path='config.yaml'):
     """Load configuration from YAML file."""
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = _yaml.safe_load(f)
         if config is None:
             raise ValueError(f"Configuration file is empty or invalid: {config_path}")
         return config
 
 
-def extract_frames(video_path, output_dir, fps=1, format='jpg', quality=95):
+def extract_frames_ffmpeg(video_path, output_dir, fps=1, quality=95):
+    """
+    Extract JPEG frames with a single FFmpeg call.
+
+    The whole decode -> fps-select -> JPEG-encode pipeline runs inside
+    FFmpeg's native code with threaded decode, so no frame crosses the
+    Python boundary.
+
+    Args:
+        video_path: Path to the video file
+        output_dir: Directory to save extracted frames
+        fps: Frames per second to extract
+        quality: JPEG quality (1-100)
+
+    Returns:
+        True if FFmpeg succeeded
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    video_name = Path(video_path).stem
+
+    # Map JPEG quality (1-100, higher is better) to FFmpeg qscale
+    # (1-31, lower is better)
+    qscale = max(1, int(31 - quality * 0.3))
+
+    cmd = [
+        FFMPEG_BIN, '-hide_banner', '-loglevel', 'error',
+        '-i', str(video_path),
+        '-vf', f'fps={fps}',
+        '-q:v', str(qscale),
+        '-threads', '0',
+        '-start_number', '0',
+        '-y',
+        os.path.join(output_dir, f'{video_name}_frame_%06d.jpg')
+    ]
+    return subprocess.run(cmd, capture_output=True).returncode == 0
+
+
+def _dhash(frame):
+    """
+    64-bit difference hash of a BGR frame.
+
+    Near-duplicate frames land within a few bits of each other, so a
+    Hamming-distance compare against the previous kept hash is enough
+    to gate out static shots before paying for the JPEG encode.
+    """
+    small = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (9, 8))
+    return int(np.packbits((small[:, 1:] > small[:, :-1]).ravel()).view(np.uint64)[0])
+
+
+def _iter_rawvideo(video_path, width, height, out_fps=None):
+    """
+    Yield decoded BGR frames from an FFmpeg rawvideo pipe.
+
+    FFmpeg decodes with its own thread pool and streams raw bgr24
+    bytes through a single pipe; each frame costs one read plus a
+    zero-copy numpy view, skipping OpenCV's per-frame overhead.
+
+    Args:
+        video_path: Path to the video file
+        width: Frame width in pixels
+        height: Frame height in pixels
+        out_fps: Optional fps filter applied inside FFmpeg
+
+    Yields:
+        uint8 BGR frames of shape (height, width, 3)
+    """
+    frame_bytes = width * height * 3
+    cmd = [
+        FFMPEG_BIN, '-hide_banner', '-loglevel', 'error',
+        '-i', str(video_path),
+        '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+        '-threads', '0'
+    ]
+    if out_fps:
+        cmd += ['-vf', f'fps={out_fps}']
+    cmd.append('pipe:1')
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=frame_bytes)
+    try:
+        while True:
+            data = proc.stdout.read(frame_bytes)
+            if len(data) < frame_bytes:
+                break
+            yield np.frombuffer(data, np.uint8).reshape(height, width, 3)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def _probe_duration(video_path):
+    """Return container duration in seconds, or 0.0 when unknown."""
+    if not FFPROBE_BIN:
+        return 0.0
+    cmd = [
+        FFPROBE_BIN, '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'csv=p=0', str(video_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return 0.0
+
+
+def parallel_extract_ffmpeg(video_path, output_dir, fps=1, quality=95, chunks=4):
+    """
+    Extract frames from a long video with concurrent FFmpeg segments.
+
+    Each segment decodes an -ss/-t time slice; keyframe-aligned seeks
+    before -i are near-instant, so splitting a long video across
+    processes scales decode almost linearly. Segment frame numbering is
+    offset so the combined output matches a single sequential run.
+
+    Args:
+        video_path: Path to the video file
+        output_dir: Directory to save extracted frames
+        fps: Frames per second to extract
+        quality: JPEG quality (1-100)
+        chunks: Number of concurrent segments
+
+    Returns:
+        True if every segment succeeded
+    """
+    duration = _probe_duration(video_path)
+    if duration <= 0:
+        return False
+
+    os.makedirs(output_dir, exist_ok=True)
+    video_name = Path(video_path).stem
+    qscale = max(1, int(31 - quality * 0.3))
+    chunks = max(1, min(chunks, os.cpu_count() or 1))
+    chunk_len = duration / chunks
+
+    # Number each segment at the first output-grid frame past its cut
+    # point and cap its frame budget at the next segment's start:
+    # without the cap a segment can emit one frame more than the next
+    # segment's start number and silently overwrite its first file
+    starts = [math.ceil(i * chunk_len * fps - 1e-9) for i in range(chunks)]
+    starts.append(math.ceil(duration * fps - 1e-9))
+
+    procs = []
+    for i in range(chunks):
+        budget = starts[i + 1] - starts[i]
+        if budget <= 0:
+            continue
+        cmd = [
+            FFMPEG_BIN, '-hide_banner', '-loglevel', 'error',
+            '-ss', f'{i * chunk_len:.6f}', '-t', f'{chunk_len:.6f}',
+            '-i', str(video_path),
+            '-vf', f'fps={fps}',
+            '-frames:v', str(budget),
+            '-q:v', str(qscale),
+            '-start_number', str(starts[i]),
+            '-y',
+            os.path.join(output_dir, f'{video_name}_frame_%06d.jpg')
+        ]
+        procs.append(subprocess.Popen(cmd, stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.DEVNULL))
+    return all(proc.wait() == 0 for proc in procs)
+
+
+def extract_frames(video_path, output_dir, fps=1, format='jpg', quality=95,
+                   verbose=True, dedup_hamming=0, chunked=True):
     """
     Extract frames from a video file.
-    
+
     Args:
         video_path: Path to the video file
         output_dir: Directory to save extracted frames
         fps: Frames per second to extract (1 = 1 frame per second)
         format: Image format (jpg, png)
         quality: JPEG quality (1-100)
+        verbose: Print a per-video summary (disabled by parallel workers)
+        dedup_hamming: Skip frames whose dHash is within this Hamming
+            distance of the last kept frame (0 = disabled)
+        chunked: Allow splitting long videos into concurrent FFmpeg
+            segments; callers that already run one worker per video
+            pass False so chunks x workers processes don't
+            oversubscribe the machine
     """
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
-    
+
+    # Set when the CLI ffmpeg rejects this file; the rawvideo pipe runs
+    # the same binary, so it would fail the same way
+    ffmpeg_failed = False
+
+    # Fast path: hand the whole extraction to FFmpeg when available.
+    # The dedup gate needs decoded frames in Python, so it routes
+    # through the rawvideo pipe or OpenCV paths below instead.
+    if format.lower() == 'jpg' and FFMPEG_BIN and dedup_hamming <= 0:
+        # Long videos decode linearly on one thread; split them into
+        # concurrent time segments instead
+        if chunked and _probe_duration(video_path) > _PARALLEL_MIN_DURATION:
+            if parallel_extract_ffmpeg(video_path, output_dir,
+                                       fps=fps, quality=quality):
+                if verbose:
+                    print(f"Extracted frames from {video_path} (ffmpeg, chunked)")
+                return True
+        if extract_frames_ffmpeg(video_path, output_dir, fps=fps, quality=quality):
+            if verbose:
+                print(f"Extracted frames from {video_path} (ffmpeg)")
+            return True
+        # Fall back to the OpenCV loop if FFmpeg failed on this file
+        ffmpeg_failed = True
+
     # Open video file
-    cap = cv2.VideoCapture(video_path)
+    cap = _open_capture(video_path)
     if not cap.isOpened():
         print(f"Error: Could not open video {video_path}")
         return False
@@ -66,32 +292,127 @@ def extract_frames(video_path, output_dir, fps=1, format='jpg', quality=95):
     
     frame_count = 0
     saved_count = 0
-    
+
     # Get video filename without extension
     video_name = Path(video_path).stem
-    
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        # Extract frame at specified interval
-        if frame_count % frame_interval == 0:
+
+    # Precompute the kept-frame indices once instead of running a
+    # Python-level modulo test on every frame; the hot check becomes a
+    # single integer comparison against next_target. The index math
+    # lives in a nogil Numba kernel so future threaded batch decoders
+    # can call it without GIL contention.
+    _PAST_END = np.iinfo(np.int64).max
+    if total_frames > 0:
+        targets = _frame_math.kept_indices(total_frames, video_fps, fps)
+    else:
+        # Frame count unknown (some streams): generate targets on the fly
+        targets = None
+    target_idx = 0
+    next_target = int(targets[0]) if targets is not None and len(targets) else 0
+    prev_hash = None
+
+    # Preallocate one BGR buffer and let retrieve() decode into it,
+    # avoiding a fresh ndarray allocation per kept frame
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    buf = np.empty((height, width, 3), dtype=np.uint8) if width > 0 and height > 0 else None
+
+    # With FFmpeg available, stream raw decoded frames through a pipe
+    # at the target rate (threaded decode, fps filter and colorspace
+    # conversion all native) and keep only the image encode in Python
+    if FFMPEG_BIN and not ffmpeg_failed and buf is not None:
+        cap.release()
+        prev_hash = None
+        for frame in _iter_rawvideo(video_path, width, height, out_fps=fps):
+            if dedup_hamming > 0:
+                frame_hash = _dhash(frame)
+                if (prev_hash is not None
+                        and bin(frame_hash ^ prev_hash).count('1') < dedup_hamming):
+                    continue
+                prev_hash = frame_hash
+
             frame_filename = f"{video_name}_frame_{saved_count:06d}.{format}"
             frame_path = os.path.join(output_dir, frame_filename)
-            
-            # Save frame
+
             if format.lower() == 'jpg':
-                cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                if _turbo_jpeg is not None:
+                    with open(frame_path, 'wb') as f:
+                        f.write(_turbo_jpeg.encode(frame, quality=quality,
+                                                   pixel_format=TJPF_BGR))
+                else:
+                    cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
             else:
                 cv2.imwrite(frame_path, frame)
-            
+
             saved_count += 1
-        
+
+        if saved_count > 0:
+            if verbose:
+                print(f"Extracted {saved_count} frames from {video_path} (rawvideo pipe)")
+            return True
+
+        # Zero frames means the pipe's decoder rejected the file;
+        # reopen the capture and give the OpenCV loop below a chance
+        cap = _open_capture(video_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video {video_path}")
+            return False
+
+    while True:
+        # grab() advances the stream without the YUV->BGR decode, so
+        # skipped frames cost almost nothing; only kept frames pay for
+        # a full retrieve()
+        if not cap.grab():
+            break
+
+        # Extract frame at specified interval
+        if frame_count == next_target:
+            if buf is not None:
+                ret, frame = cap.retrieve(buf)
+            else:
+                ret, frame = cap.retrieve()
+            if not ret:
+                break
+
+            # Near-duplicate gate: skip the encode and write entirely
+            # when the frame hashes next to the last kept one
+            keep = True
+            if dedup_hamming > 0:
+                frame_hash = _dhash(frame)
+                if (prev_hash is not None
+                        and bin(frame_hash ^ prev_hash).count('1') < dedup_hamming):
+                    keep = False
+                else:
+                    prev_hash = frame_hash
+
+            if keep:
+                frame_filename = f"{video_name}_frame_{saved_count:06d}.{format}"
+                frame_path = os.path.join(output_dir, frame_filename)
+
+                # Save frame
+                if format.lower() == 'jpg':
+                    if _turbo_jpeg is not None:
+                        # libjpeg-turbo does the DCT/colorspace work with SIMD
+                        with open(frame_path, 'wb') as f:
+                            f.write(_turbo_jpeg.encode(frame, quality=quality,
+                                                       pixel_format=TJPF_BGR))
+                    else:
+                        cv2.imwrite(frame_path, frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                else:
+                    cv2.imwrite(frame_path, frame)
+
+                saved_count += 1
+            target_idx += 1
+            if targets is not None:
+                next_target = int(targets[target_idx]) if target_idx < len(targets) else _PAST_END
+            else:
+                next_target += frame_interval
+
         frame_count += 1
     
     cap.release()
-    print(f"Extracted {saved_count} frames from {video_path}")
+    if verbose:
+        print(f"Extracted {saved_count} frames from {video_path}")
     return True
 
 
@@ -107,36 +428,55 @@ def process_directory(input_dir, output_dir, config):
     video_formats = config['video']['formats']
     frame_config = config['frame_extraction']
     
-    # Find all video files
+    # Find all video files in one walk instead of one recursive rglob
+    # sweep per format and case
+    extensions = {f".{format.lower()}" for format in video_formats}
     video_files = []
-    for format in video_formats:
-        video_files.extend(Path(input_dir).rglob(f"*.{format}"))
-        video_files.extend(Path(input_dir).rglob(f"*.{format.upper()}"))
-    
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in extensions:
+                video_files.append(Path(root) / name)
+
     if not video_files:
         print(f"No video files found in {input_dir}")
         return
     
     print(f"Found {len(video_files)} video files")
-    
-    # Process each video
-    for video_path in tqdm(video_files, desc="Extracting frames"):
+
+    # Build the job list up-front (including output directories) so the
+    # workers only do CPU-bound decode/encode work
+    jobs = []
+    for video_path in video_files:
         # Maintain directory structure in output
         relative_path = video_path.relative_to(input_dir)
         category_dir = relative_path.parent
-        
+
         # Create output directory maintaining category structure
         video_output_dir = os.path.join(output_dir, category_dir, video_path.stem)
         os.makedirs(video_output_dir, exist_ok=True)
-        
-        # Extract frames
-        extract_frames(
+
+        jobs.append((
             str(video_path),
             video_output_dir,
-            fps=frame_config['fps'],
-            format=frame_config['format'],
-            quality=frame_config.get('quality', 95)
-        )
+            frame_config['fps'],
+            frame_config['format'],
+            frame_config.get('quality', 95)
+        ))
+
+    dedup_hamming = frame_config.get('dedup_hamming', 0)
+
+    # Extract frames from all videos concurrently: each video is
+    # independent and decode+JPEG-encode is CPU-bound, so this scales
+    # with available cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(extract_frames, *job, verbose=False,
+                            dedup_hamming=dedup_hamming, chunked=False)
+            for job in jobs
+        ]
+        for future in tqdm(as_completed(futures), total=len(futures),
+                           desc="Extracting frames"):
+            future.result()
 
 
 def main():
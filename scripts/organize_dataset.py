@@ -13,10 +13,15 @@ This script organizes video files into train/test/validation splits.
 
 import os
 import argparse
-import yaml
 import shutil
+import sys
+import numpy as np
 from pathlib import Path
-import random
+
+# Add parent directory to path to import utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import _yaml
 
 
 def load_config(config_path='config.yaml'):
@@ -24,7 +29,7 @@ def load_config(config_path='config.yaml'):
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = _yaml.safe_load(f)
         if config is None:
             raise ValueError(f"Configuration file is empty or invalid: {config_path}")
         return config
@@ -45,93 +50,146 @@ def get_video_files(directory, video_formats):
             continue
         
         category = category_dir.name
+
+        # Single walk with a case-insensitive extension check instead of
+        # one recursive rglob sweep per format and case
+        extensions = {f".{format.lower()}" for format in video_formats}
         videos = []
-        
-        for format in video_formats:
-            videos.extend(category_dir.rglob(f"*.{format}"))
-            videos.extend(category_dir.rglob(f"*.{format.upper()}"))
-        
+        for root, _, files in os.walk(category_dir):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in extensions:
+                    videos.append(os.path.join(root, name))
+
         if videos:
-            videos_by_category[category] = [str(v) for v in videos]
-    
+            videos_by_category[category] = videos
+
     return videos_by_category
 
 
 def split_dataset(videos_by_category, train_ratio, test_ratio, validation_ratio, random_seed=42):
     """
-    Split dataset into train/test/validation sets.
-    
+    Split dataset into train/test/validation sets per category.
+
+    Yields one category at a time so callers can act on each split
+    slice immediately and discard it, instead of holding three parallel
+    dicts of every path in memory.
+
     Args:
         videos_by_category: Dictionary of category -> video files
         train_ratio: Ratio for training set
         test_ratio: Ratio for test set
         validation_ratio: Ratio for validation set
         random_seed: Random seed for reproducibility
+
+    Yields:
+        (category, train_files, test_files, validation_files) tuples
     """
-    random.seed(random_seed)
-    
-    train_files = {}
-    test_files = {}
-    validation_files = {}
-    
+    # One vectorized permutation per category instead of a Python-level
+    # Fisher-Yates; also seeds reproducibly across platforms
+    rng = np.random.default_rng(random_seed)
+
     for category, videos in videos_by_category.items():
         # Shuffle videos
-        random.shuffle(videos)
-        
+        indices = rng.permutation(len(videos))
+        videos = [videos[i] for i in indices]
+
         # Calculate split sizes
         total = len(videos)
         train_size = int(total * train_ratio)
         test_size = int(total * test_ratio)
-        
+
         # Split videos
         train = videos[:train_size]
         remaining = videos[train_size:]
-        
+
         test = remaining[:test_size]
         validation = remaining[test_size:]
-        
-        train_files[category] = train
-        test_files[category] = test
-        validation_files[category] = validation
-        
+
         print(f"Category '{category}': Train={len(train)}, Test={len(test)}, Validation={len(validation)}")
-    
-    return train_files, test_files, validation_files
+
+        yield category, train, test, validation
 
 
-def copy_files(file_dict, output_dir):
+def _transfer_file(file_path, dest_path, link_mode='hardlink'):
     """
-    Copy files to output directory maintaining category structure.
-    
+    Place one file at dest_path using the cheapest available mechanism.
+
+    Hardlinks cost a single syscall with zero data movement, so multi-GB
+    datasets are organized at metadata speed and not physically
+    duplicated. Cross-filesystem (or unsupported) cases fall back to a
+    zero-copy in-kernel sendfile, then to a regular copy.
+
     Args:
-        file_dict: Dictionary of category -> file paths
-        output_dir: Output directory
+        file_path: Source file path
+        dest_path: Destination file path
+        link_mode: Transfer mode ('hardlink', 'copy', 'symlink')
     """
-    for category, files in file_dict.items():
-        category_dir = os.path.join(output_dir, category)
-        os.makedirs(category_dir, exist_ok=True)
-        
-        for file_path in files:
-            if not os.path.exists(file_path):
-                print(f"Warning: Source file not found: {file_path}")
-                continue
-            
-            filename = os.path.basename(file_path)
-            dest_path = os.path.join(category_dir, filename)
-            try:
-                shutil.copy2(file_path, dest_path)
-            except Exception as e:
-                print(f"Error copying {file_path} to {dest_path}: {e}")
-
-
-def organize_dataset(input_dir, output_dir, config):
+    if link_mode == 'symlink':
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+        os.symlink(os.path.abspath(file_path), dest_path)
+        return
+
+    if link_mode == 'hardlink':
+        try:
+            os.link(file_path, dest_path)
+            return
+        except OSError:
+            pass  # cross-filesystem, unsupported, or destination exists
+
+    try:
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as src, open(dest_path, 'wb') as dst:
+            remaining = size
+            while remaining > 0:
+                if hasattr(os, 'sendfile'):
+                    # Zero-copy in-kernel transfer; offset=None follows
+                    # the source file position
+                    n = os.sendfile(dst.fileno(), src.fileno(), None, remaining)
+                else:
+                    n = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if n == 0:
+                    break
+                remaining -= n
+        # Preserve timestamps and permissions the way copy2 would
+        shutil.copystat(file_path, dest_path)
+    except (AttributeError, OSError):
+        shutil.copy2(file_path, dest_path)
+
+
+def copy_files(files, category_dir, link_mode='hardlink'):
+    """
+    Copy one category's files into the given split directory.
+
+    Args:
+        files: Iterable of file paths
+        category_dir: Destination directory for this category
+        link_mode: Transfer mode ('hardlink', 'copy', 'symlink')
+    """
+    os.makedirs(category_dir, exist_ok=True)
+
+    for file_path in files:
+        if not os.path.exists(file_path):
+            print(f"Warning: Source file not found: {file_path}")
+            continue
+
+        filename = os.path.basename(file_path)
+        dest_path = os.path.join(category_dir, filename)
+        try:
+            _transfer_file(file_path, dest_path, link_mode)
+        except Exception as e:
+            print(f"Error copying {file_path} to {dest_path}: {e}")
+
+
+def organize_dataset(input_dir, output_dir, config, link_mode='hardlink'):
     """
     Organize dataset into train/test/validation splits.
-    
+
     Args:
         input_dir: Input directory containing videos organized by category
         output_dir: Output directory for organized dataset
         config: Configuration dictionary
+        link_mode: File transfer mode ('hardlink', 'copy', 'symlink')
     """
     video_formats = config['video']['formats']
     splits = config['dataset']['splits']
@@ -146,34 +204,29 @@ def organize_dataset(input_dir, output_dir, config):
     
     print(f"Found {len(videos_by_category)} categories")
     
-    # Split dataset
-    print("\nSplitting dataset...")
-    train_files, test_files, validation_files = split_dataset(
+    # Split and place files in one fused pass: each category's slices
+    # are emitted straight into the output tree and then discarded, so
+    # peak memory stays at one category's paths rather than the whole
+    # dataset held in three parallel dicts
+    print("\nSplitting and placing files...")
+    totals = {'train': 0, 'test': 0, 'validation': 0}
+    split_iter = split_dataset(
         videos_by_category,
         splits['train_ratio'],
         splits['test_ratio'],
         splits['validation_ratio']
     )
-    
-    # Create output directories
-    train_dir = os.path.join(output_dir, 'train')
-    test_dir = os.path.join(output_dir, 'test')
-    validation_dir = os.path.join(output_dir, 'validation')
-    
-    # Copy files to respective directories
-    print("\nCopying files to train directory...")
-    copy_files(train_files, train_dir)
-    
-    print("Copying files to test directory...")
-    copy_files(test_files, test_dir)
-    
-    print("Copying files to validation directory...")
-    copy_files(validation_files, validation_dir)
-    
+    for category, train, test, validation in split_iter:
+        for split_name, files in (('train', train), ('test', test),
+                                  ('validation', validation)):
+            copy_files(files, os.path.join(output_dir, split_name, category),
+                       link_mode)
+            totals[split_name] += len(files)
+
     print("\nDataset organization completed!")
-    print(f"Train: {sum(len(files) for files in train_files.values())} videos")
-    print(f"Test: {sum(len(files) for files in test_files.values())} videos")
-    print(f"Validation: {sum(len(files) for files in validation_files.values())} videos")
+    print(f"Train: {totals['train']} videos")
+    print(f"Test: {totals['test']} videos")
+    print(f"Validation: {totals['validation']} videos")
 
 
 def main():
@@ -190,6 +243,9 @@ def main():
                        help='Test set ratio (overrides config)')
     parser.add_argument('--validation-ratio', type=float, default=None,
                        help='Validation set ratio (overrides config)')
+    parser.add_argument('--link-mode', type=str, default='hardlink',
+                       choices=['hardlink', 'copy', 'symlink'],
+                       help='How to place files in the output tree (hardlink avoids duplicating data)')
     
     args = parser.parse_args()
     
@@ -205,7 +261,7 @@ def main():
         config['dataset']['splits']['validation_ratio'] = args.validation_ratio
     
     # Organize dataset
-    organize_dataset(args.input, args.output, config)
+    organize_dataset(args.input, args.output, config, link_mode=args.link_mode)
 
 
 if __name__ == '__main__':
@@ -12,20 +12,40 @@ This script processes video files: resizing, format conversion, and validation.
 """
 
 import cv2
+import json
 import os
 import argparse
-import yaml
+import queue
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
+import shutil
 import subprocess
 
+# Add parent directory to path to import utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import _yaml
+from utils.video_utils import _has_nvenc, _open_capture
+
+# Resolved once at import; None when FFmpeg/ffprobe is not installed
+FFMPEG_BIN = shutil.which('ffmpeg')
+FFPROBE_BIN = shutil.which('ffprobe')
+
+# Workers parallelize across videos already; keep OpenCV from spawning
+# its own per-process thread pool on top and let FFmpeg's decoder
+# threads do the work
+cv2.setNumThreads(0)
+
 
 def load_config(config_path='config.yaml'):
     """Load configuration from YAML file."""
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = _yaml.safe_load(f)
         if config is None:
             raise ValueError(f"Configuration file is empty or invalid: {config_path}")
         return config
@@ -33,7 +53,34 @@ def load_config(config_path='config.yaml'):
 
 def get_video_info(video_path):
     """Get video information."""
-    cap = cv2.VideoCapture(video_path)
+    # ffprobe parses the container header without opening a decoder,
+    # which is far cheaper than a full VideoCapture probe
+    if FFPROBE_BIN:
+        cmd = [
+            FFPROBE_BIN, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=width,height,r_frame_rate,nb_frames',
+            '-of', 'json', str(video_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            try:
+                stream = json.loads(result.stdout)['streams'][0]
+                num, den = stream['r_frame_rate'].split('/')
+                fps = float(num) / float(den) if float(den) else 0.0
+                # Some containers omit nb_frames; let the decoder
+                # fallback count frames rather than reporting zero
+                frame_count = int(stream['nb_frames'])
+                return {
+                    'fps': fps,
+                    'width': int(stream['width']),
+                    'height': int(stream['height']),
+                    'frame_count': frame_count,
+                    'duration': frame_count / fps if fps > 0 else 0.0
+                }
+            except (KeyError, IndexError, ValueError):
+                pass  # malformed probe output: fall back to OpenCV
+
+    cap = _open_capture(video_path)
     if not cap.isOpened():
         return None
     
@@ -54,39 +101,133 @@ def get_video_info(video_path):
     return info
 
 
-def resize_video(input_path, output_path, target_size=(224, 224)):
+def resize_video(input_path, output_path, target_size=(224, 224), use_gpu=False):
     """
     Resize video to target dimensions.
-    
+
+    Prefers a single FFmpeg pipeline (SIMD libswscale resize plus
+    multi-threaded libx264 encode, no per-frame Python round-trips) and
+    falls back to the OpenCV loop when FFmpeg is not installed. With
+    use_gpu and an NVENC-capable FFmpeg build, decode, scale and encode
+    all stay on the GPU (NVDEC -> scale_cuda -> NVENC) with no PCIe
+    round-trip per frame.
+
     Args:
         input_path: Input video path
         output_path: Output video path
         target_size: Target (width, height)
+        use_gpu: Use NVDEC/NVENC hardware acceleration when available
     """
-    cap = cv2.VideoCapture(input_path)
+    if FFMPEG_BIN and use_gpu and _has_nvenc():
+        cmd = [
+            FFMPEG_BIN, '-hide_banner', '-loglevel', 'error',
+            '-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda',
+            '-i', str(input_path),
+            '-vf', f'scale_cuda={target_size[0]}:{target_size[1]}',
+            '-c:v', 'h264_nvenc',
+            '-preset', 'p4',
+            '-an',
+            '-y',
+            str(output_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode == 0:
+            return True
+        # Fall through to software encode on driver/codec errors
+
+    if FFMPEG_BIN:
+        cmd = [
+            FFMPEG_BIN, '-hide_banner', '-loglevel', 'error',
+            '-i', str(input_path),
+            '-vf', f'scale={target_size[0]}:{target_size[1]}',
+            '-c:v', 'libx264',
+            '-preset', 'veryfast',
+            '-an',
+            '-y',
+            str(output_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode == 0:
+            return True
+        # Fall through to the OpenCV path on encoder/filter errors
+
+    return _resize_video_opencv(input_path, output_path, target_size)
+
+
+def _resize_video_opencv(input_path, output_path, target_size=(224, 224)):
+    """
+    Frame-by-frame OpenCV resize fallback.
+
+    Decode, resize and encode run as a three-stage thread pipeline
+    joined by bounded queues: cv2.read/resize/write all release the GIL,
+    so the stages overlap and throughput approaches the slowest stage
+    instead of their sum. Serial loop on machines with fewer than three
+    cores, where pipelining would only add queue overhead.
+    """
+    cap = _open_capture(input_path)
     if not cap.isOpened():
         return False
-    
+
     fps = cap.get(cv2.CAP_PROP_FPS)
     # Use default FPS if invalid
     if fps <= 0:
         fps = 30.0
-    
+
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     out = cv2.VideoWriter(output_path, fourcc, fps, target_size)
-    
+
     if not out.isOpened():
         cap.release()
         return False
-    
+
+    if cv2.getNumberOfCPUs() < 3:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            resized_frame = cv2.resize(frame, target_size)
+            out.write(resized_frame)
+
+        cap.release()
+        out.release()
+        return True
+
+    # Bounded queues cap memory at a handful of frames while keeping
+    # every stage fed
+    decoded = queue.Queue(maxsize=8)
+    resized = queue.Queue(maxsize=8)
+
+    def _decode():
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                decoded.put(None)
+                break
+            decoded.put(frame)
+
+    def _resize():
+        while True:
+            frame = decoded.get()
+            if frame is None:
+                resized.put(None)
+                break
+            resized.put(cv2.resize(frame, target_size))
+
+    decode_thread = threading.Thread(target=_decode, daemon=True)
+    resize_thread = threading.Thread(target=_resize, daemon=True)
+    decode_thread.start()
+    resize_thread.start()
+
+    # The encoder runs in the calling thread
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        frame = resized.get()
+        if frame is None:
             break
-        
-        resized_frame = cv2.resize(frame, target_size)
-        out.write(resized_frame)
-    
+        out.write(frame)
+
+    decode_thread.join()
+    resize_thread.join()
     cap.release()
     out.release()
     return True
@@ -159,10 +300,11 @@ def process_video(input_path, output_path, config, resize=True, convert=False):
     
     # Get target resolution
     target_size = tuple(config['video']['processing']['resolution'])
-    
+    use_gpu = config['video']['processing'].get('use_gpu', False)
+
     # Process video
     if resize:
-        return resize_video(input_path, output_path, target_size)
+        return resize_video(input_path, output_path, target_size, use_gpu=use_gpu)
     elif convert:
         return convert_video_format(input_path, output_path)
     else:
@@ -183,29 +325,43 @@ def process_directory(input_dir, output_dir, config):
     """
     video_formats = config['video']['formats']
     
-    # Find all video files
+    # Find all video files in one walk instead of one recursive rglob
+    # sweep per format and case
+    extensions = {f".{format.lower()}" for format in video_formats}
     video_files = []
-    for format in video_formats:
-        video_files.extend(Path(input_dir).rglob(f"*.{format}"))
-        video_files.extend(Path(input_dir).rglob(f"*.{format.upper()}"))
-    
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in extensions:
+                video_files.append(Path(root) / name)
+
     if not video_files:
         print(f"No video files found in {input_dir}")
         return
     
     print(f"Found {len(video_files)} video files")
-    
-    # Process each video
-    for video_path in tqdm(video_files, desc="Processing videos"):
+
+    # Build the job list up-front so workers only do decode/encode work
+    jobs = []
+    for video_path in video_files:
         # Maintain directory structure in output
         relative_path = video_path.relative_to(input_dir)
         output_path = os.path.join(output_dir, relative_path)
-        
+
         # Ensure output format is mp4
         output_path = str(Path(output_path).with_suffix('.mp4'))
-        
-        # Process video
-        process_video(str(video_path), output_path, config, resize=True)
+
+        jobs.append((str(video_path), output_path))
+
+    # Process all videos concurrently: re-encoding is CPU-bound and each
+    # video is independent, so this scales with available cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(process_video, src, dst, config, resize=True)
+            for src, dst in jobs
+        ]
+        for future in tqdm(as_completed(futures), total=len(futures),
+                           desc="Processing videos"):
+            future.result()
 
 
 def main():
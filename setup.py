@@ -31,11 +31,16 @@ setup(
         "numpy>=1.24.0",
         "pillow>=10.0.0",
         "tqdm>=4.66.0",
-        "pyyaml>=6.0",
+        "pyyaml>=6.0",  # install with libyaml for the fast C loader
         "scikit-learn>=1.3.0",
         "matplotlib>=3.7.0",
         "pandas>=2.0.0",
     ],
+    extras_require={
+        # SIMD JPEG encoding; also needs the native libturbojpeg, so
+        # the code treats it as strictly optional
+        "turbojpeg": ["PyTurboJPEG>=1.7.0"],
+    },
     python_requires=">=3.8",
     classifiers=[
         "Development Status :: 4 - Beta",
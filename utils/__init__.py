@@ -10,17 +10,25 @@ Organization: RSK World
 Utility modules for video classification dataset management.
 """
 
-from . import video_utils
-from . import dataset_utils
-from . import advanced_features
-from . import unique_features
+import importlib
 
-__all__ = [
+# Submodules resolve lazily (PEP 562) so the CLI scripts can import
+# lightweight helpers like _yaml and _json without dragging cv2 and
+# pandas into processes that never touch them
+_SUBMODULES = (
     'video_utils',
     'dataset_utils',
     'advanced_features',
     'unique_features'
-]
+)
+
+__all__ = list(_SUBMODULES)
 
 __version__ = '1.0.0'
 
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
@@ -0,0 +1,50 @@
+"""
+JIT-Compiled Frame Index Math for Video Classification Dataset
+Author: Molla Samser
+Designer & Tester: Rima Khatun
+Website: https://rskworld.in
+Email: help@rskworld.in, support@rskworld.in
+Phone: +91 93305 39277
+Organization: RSK World
+
+Optional Numba-compiled helpers for frame sampling arithmetic. The
+nogil kernels let threaded callers run index math truly in parallel;
+everything degrades to plain NumPy when Numba is not installed.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(cache=True, nogil=True)
+    def _kept_indices_jit(total, step):
+        """Indices 0, step, 2*step, ... below total."""
+        n = (total + step - 1) // step
+        out = np.empty(n, np.int64)
+        for i in range(n):
+            out[i] = i * step
+        return out
+
+
+def kept_indices(total_frames, video_fps, out_fps):
+    """
+    Compute the source-frame indices kept when resampling to out_fps.
+
+    Args:
+        total_frames: Total frames in the source video
+        video_fps: Source frame rate
+        out_fps: Target extraction rate
+
+    Returns:
+        int64 array of kept frame indices
+    """
+    step = max(1, int(video_fps / out_fps))
+    if HAS_NUMBA:
+        return _kept_indices_jit(total_frames, step)
+    return np.arange(0, total_frames, step, dtype=np.int64)
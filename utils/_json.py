@@ -0,0 +1,38 @@
+"""
+JSON Serialization Helpers for Video Classification Dataset
+Author: Molla Samser
+Designer & Tester: Rima Khatun
+Website: https://rskworld.in
+Email: help@rskworld.in, support@rskworld.in
+Phone: +91 93305 39277
+Organization: RSK World
+
+Writes through orjson when installed: its native encoder is typically
+5-10x faster than the standard library on large file lists, and
+indentation is not the recursive Python slow path. Falls back to the
+standard library otherwise.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dump_indented(data, output_path):
+    """
+    Write data as 2-space-indented JSON.
+
+    Args:
+        data: JSON-serializable object (numpy scalars allowed with orjson)
+        output_path: Path to write to
+    """
+    if orjson is not None:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(
+                data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
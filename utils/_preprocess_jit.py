@@ -0,0 +1,63 @@
+"""
+JIT-Compiled Preprocessing Kernels for Video Classification Dataset
+Author: Molla Samser
+Designer & Tester: Rima Khatun
+Website: https://rskworld.in
+Email: help@rskworld.in, support@rskworld.in
+Phone: +91 93305 39277
+Organization: RSK World
+
+Optional Numba-compiled kernels for per-frame normalization. Imported
+lazily by video_utils; everything degrades to plain NumPy when Numba
+is not installed.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True, nogil=True)
+    def _normalize_into(out, frame):
+        """Scale uint8 pixels to [0, 1] float32 over the flat buffer."""
+        # A single flat loop vectorizes cleanly (LLVM emits the
+        # convert-and-multiply as packed SIMD lanes) and load-balances
+        # across threads regardless of the array's rank
+        flat_src = frame.ravel()
+        flat_dst = out.ravel()
+        for i in prange(flat_src.size):
+            flat_dst[i] = flat_src[i] * np.float32(1.0 / 255.0)
+
+
+def normalize_frame_jit(frame: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Normalize an array to [0, 1] using the Numba kernel when available.
+
+    Works on any rank — single frames or whole (N, H, W, C) batches —
+    as long as the memory is contiguous so the flat kernel sees a view.
+
+    Args:
+        frame: uint8 array of any shape
+        out: Optional preallocated float32 output buffer
+
+    Returns:
+        Normalized array as float32
+    """
+    if not HAS_NUMBA or not frame.flags['C_CONTIGUOUS']:
+        # Multiplying with an explicit float32 output dtype converts
+        # and scales in one sweep, skipping the astype temporary the
+        # two-step version allocated
+        return np.multiply(frame, np.float32(1.0 / 255.0),
+                           dtype=np.float32)
+
+    if (out is None or out.shape != frame.shape
+            or not out.flags['C_CONTIGUOUS']):
+        out = np.empty(frame.shape, dtype=np.float32)
+
+    _normalize_into(out, frame)
+    return out
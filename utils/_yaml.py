@@ -0,0 +1,25 @@
+"""
+YAML Loading Helper for Video Classification Dataset
+Author: Molla Samser
+Designer & Tester: Rima Khatun
+Website: https://rskworld.in
+Email: help@rskworld.in, support@rskworld.in
+Phone: +91 93305 39277
+Organization: RSK World
+
+Thin wrapper around PyYAML that routes through the C-backed loader
+(libyaml) when it is available, cutting config parse time on every
+script startup. Falls back to the pure-Python SafeLoader otherwise.
+"""
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+
+def safe_load(stream):
+    """Parse a YAML document safely with the fastest available loader."""
+    return yaml.load(stream, Loader=_Loader)
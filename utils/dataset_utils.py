@@ -10,10 +10,13 @@ Organization: RSK World
 Utility functions for dataset management and loading.
 """
 
+import functools
 import os
 import json
-from pathlib import Path
+
+from utils import _json
 from typing import List, Dict, Tuple
+import numpy as np
 import pandas as pd
 
 
@@ -27,11 +30,12 @@ def get_categories(dataset_dir: str) -> List[str]:
     Returns:
         List of category names
     """
-    categories = []
-    for item in Path(dataset_dir).iterdir():
-        if item.is_dir():
-            categories.append(item.name)
-    return sorted(categories)
+    # os.scandir avoids building a Path object (and usually an extra
+    # stat) per entry; the d_type from the directory read answers
+    # is_dir directly on most filesystems
+    with os.scandir(dataset_dir) as entries:
+        return sorted(entry.name for entry in entries
+                      if entry.is_dir(follow_symlinks=False))
 
 
 def get_videos_by_category(dataset_dir: str, video_formats: List[str] = None) -> Dict[str, List[str]]:
@@ -47,21 +51,114 @@ def get_videos_by_category(dataset_dir: str, video_formats: List[str] = None) ->
     """
     if video_formats is None:
         video_formats = ['mp4', 'mov', 'avi', 'mkv']
-    
-    videos_by_category = {}
-    categories = get_categories(dataset_dir)
-    
-    for category in categories:
-        category_dir = Path(dataset_dir) / category
-        videos = []
-        
-        for format in video_formats:
-            videos.extend(category_dir.rglob(f"*.{format}"))
-            videos.extend(category_dir.rglob(f"*.{format.upper()}"))
-        
-        videos_by_category[category] = [str(v) for v in videos]
-    
-    return videos_by_category
+
+    # Statistics, metadata, reports and DataFrames all call this for
+    # the same directory; cache on (path, tree state, formats) so
+    # repeated calls don't re-walk the tree
+    cached = _cached_videos_by_category(str(dataset_dir),
+                                        _dir_state(dataset_dir),
+                                        tuple(video_formats))
+
+    # Hand out fresh lists so callers that shuffle or mutate results
+    # don't corrupt the cache
+    return {category: list(videos) for category, videos in cached.items()}
+
+
+def _dir_state(dataset_dir: str) -> Tuple:
+    """
+    Cheap fingerprint of a dataset directory's listing state.
+
+    A directory's mtime only changes when entries are created or
+    removed directly inside it, and the memoized scan recurses to
+    arbitrary depth — so the fingerprint has to fold in the mtime of
+    every directory the scan will visit, not just the top-level
+    category dirs. Walking directories only (files are never statted)
+    keeps this orders of magnitude cheaper than the scan it guards.
+    """
+    state = [(dataset_dir, os.stat(dataset_dir).st_mtime_ns)]
+
+    def _walk(dir_path: str):
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    state.append((entry.path, entry.stat().st_mtime_ns))
+                    _walk(entry.path)
+
+    _walk(dataset_dir)
+    state.sort()
+    return tuple(state)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_videos_by_category(dataset_dir: str, state: Tuple,
+                               video_formats: Tuple[str, ...]) -> Dict[str, List[str]]:
+    """One case-insensitive scandir walk, memoized per directory state."""
+    return _scan_split(dataset_dir, list(video_formats))
+
+
+def _scan_split_entries(split_dir: str,
+                        video_formats: List[str] = None) -> Dict[str, List[Tuple]]:
+    """
+    Scan a split directory once, returning per-video stat data by category.
+
+    Uses recursive os.scandir so each file's size and mtime come from the
+    DirEntry's cached stat — no second stat syscall per file.
+
+    Args:
+        split_dir: Split directory containing category subdirectories
+        video_formats: List of video formats (default: ['mp4', 'mov', 'avi', 'mkv'])
+
+    Returns:
+        Dictionary mapping category names to lists of
+        (path, name, size, mtime) tuples
+    """
+    if video_formats is None:
+        video_formats = ['mp4', 'mov', 'avi', 'mkv']
+
+    extensions = {f".{format.lower()}" for format in video_formats}
+
+    def _walk(dir_path: str, out: list):
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    _walk(entry.path, out)
+                elif (entry.is_file()
+                      and os.path.splitext(entry.name)[1].lower() in extensions):
+                    stat = entry.stat()
+                    out.append((entry.path, entry.name,
+                                stat.st_size, stat.st_mtime))
+
+    entries_by_category = {}
+    with os.scandir(split_dir) as entries:
+        category_dirs = sorted((e for e in entries if e.is_dir()), key=lambda e: e.name)
+        for category_entry in category_dirs:
+            videos = []
+            _walk(category_entry.path, videos)
+            entries_by_category[category_entry.name] = videos
+
+    return entries_by_category
+
+
+def _scan_split(split_dir: str, video_formats: List[str] = None) -> Dict[str, List[str]]:
+    """
+    Scan a split directory in a single pass, grouping videos by category.
+
+    Unlike get_videos_by_category, this walks the tree exactly once with
+    os.scandir, so callers that need both statistics and file lists pay
+    the directory-traversal cost only once.
+
+    Args:
+        split_dir: Split directory containing category subdirectories
+        video_formats: List of video formats (default: ['mp4', 'mov', 'avi', 'mkv'])
+
+    Returns:
+        Dictionary mapping category names to lists of video paths
+    """
+    entries_by_category = _scan_split_entries(split_dir, video_formats)
+    return {
+        category: [path for path, _, _, _ in videos]
+        for category, videos in entries_by_category.items()
+    }
 
 
 def create_dataset_metadata(dataset_dir: str, output_path: str = 'metadata.json'):
@@ -85,9 +182,8 @@ def create_dataset_metadata(dataset_dir: str, output_path: str = 'metadata.json'
             'files': videos
         }
     
-    with open(output_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
-    
+    _json.dump_indented(metadata, output_path)
+
     return metadata
 
 
@@ -158,24 +254,26 @@ def split_videos_by_category(videos_by_category: Dict[str, List[str]],
     Returns:
         Tuple of (train, test, validation) dictionaries
     """
-    import random
-    random.seed(42)
-    
+    # One C-level permutation per category instead of Python-level
+    # Fisher-Yates swaps; a single generator seeds once for all
+    # categories and stays reproducible
+    rng = np.random.default_rng(42)
+
     train = {}
     test = {}
     validation = {}
-    
+
     for category, videos in videos_by_category.items():
-        random.shuffle(videos)
-        
-        total = len(videos)
+        shuffled = np.asarray(videos, dtype=object)[rng.permutation(len(videos))]
+
+        total = len(shuffled)
         train_size = int(total * train_ratio)
         test_size = int(total * test_ratio)
-        
-        train[category] = videos[:train_size]
-        test[category] = videos[train_size:train_size + test_size]
-        validation[category] = videos[train_size + test_size:]
-    
+
+        train[category] = shuffled[:train_size].tolist()
+        test[category] = shuffled[train_size:train_size + test_size].tolist()
+        validation[category] = shuffled[train_size + test_size:].tolist()
+
     return train, test, validation
 
 
@@ -195,15 +293,21 @@ def create_dataframe(dataset_dir: str, split: str = None) -> pd.DataFrame:
     
     videos_by_category = get_videos_by_category(dataset_dir)
     label_mapping = create_label_mapping(list(videos_by_category.keys()))
-    
-    data = []
+
+    # Build column arrays directly: constructing from a list of dicts
+    # makes pandas reflect every dict. A categorical 'category' column
+    # stores each name once, and labels fit comfortably in int16.
+    paths = []
+    categories = []
+    labels = []
     for category, videos in videos_by_category.items():
-        for video in videos:
-            data.append({
-                'video_path': video,
-                'category': category,
-                'label': label_mapping[category]
-            })
-    
-    return pd.DataFrame(data)
+        paths.extend(videos)
+        categories.extend([category] * len(videos))
+        labels.extend([label_mapping[category]] * len(videos))
+
+    return pd.DataFrame({
+        'video_path': paths,
+        'category': pd.Categorical(categories),
+        'label': np.asarray(labels, dtype=np.int16)
+    })
 